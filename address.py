@@ -4,8 +4,10 @@
 # Data format: 9600 8-bit data, 1 stop bit, no checksum
 # High bit first, low bit last (Big Endian)
 
+import struct
+
 # ========== BATTERY TEMPERATURE SECTION ==========
-# Battery Temperature Registers (Separate read from main pack data)
+# Battery Temperature Registers (read together with pack data, see COMBINED READ SECTION)
 # Address: 0x30 - 0x37 (8 registers for cell temperature 1-4)
 # Data offset: 40 (actual temperature = register value - 40)
 BATT_TEMP_START_ADDRESS = 0x30
@@ -83,190 +85,73 @@ OFFSET_FAULT_2 = 0x2F  # 0x67: Fault Status 2
 OFFSET_FAULT_3 = 0x30  # 0x68: Fault Status 3
 OFFSET_FAULT_4 = 0x31  # 0x69: Fault Status 4
 
+# ========== COMBINED READ SECTION ==========
+# Temperature and pack data are contiguous, so both are read in one request
+# Address: 0x30 - 0x69 (8 temperature + 50 pack registers = 58 registers)
+COMBINED_START_ADDRESS = BATT_TEMP_START_ADDRESS
+COMBINED_REGISTER_COUNT = BATT_TEMP_REGISTER_COUNT + REGISTER_COUNT
+# Index of START_ADDRESS (0x38) within a combined read
+COMBINED_PACK_OFFSET = BATT_TEMP_REGISTER_COUNT
+
 # Constants for Calculation
 CURRENT_OFFSET = 30000
 TEMP_OFFSET = 40
 
+
 # ========== FAULT STATUS SECTION ==========
 
+# Each fault register is 16-bit. Following the Daly docs, "Byte 0" is taken
+# as the first byte transmitted (MSB in Big Endian Modbus) and "Byte 1" as
+# the LSB; "Bit 0" is the LSB of that byte. (Subject to verification)
+#
+# The four registers are packed into one 64-bit word in transmission order:
+# Fault 1 Byte 0 -> bits 0-7, Fault 1 Byte 1 -> bits 8-15, ...,
+# Fault 4 Byte 1 -> bits 56-63. None marks a reserved bit.
+FAULT_NAMES_BY_BITPOS = (
+    # Fault 1 (0x66) - Byte 0: Voltage
+    "Cell V High L1", "Cell V High L2", "Cell V Low L1", "Cell V Low L2",
+    "Pack V High L1", "Pack V High L2", "Pack V Low L1", "Pack V Low L2",
+    # Fault 1 (0x66) - Byte 1: Temps
+    "Chg Temp High L1", "Chg Temp High L2", "Chg Temp Low L1", "Chg Temp Low L2",
+    "Dischg Temp High L1", "Dischg Temp High L2", "Dischg Temp Low L1", "Dischg Temp Low L2",
+    # Fault 2 (0x67) - Byte 0: Current / SOC
+    "Chg Overcur L1", "Chg Overcur L2", "Dischg Overcur L1", "Dischg Overcur L2",
+    "SOC High L1", "SOC High L2", "SOC Low L1", "SOC Low L2",
+    # Fault 2 (0x67) - Byte 1: Diff / Temps
+    "Diff V High L1", "Diff V High L2", "Diff Temp High L1", "Diff Temp High L2",
+    "MOS Temp High L1", "MOS Temp High L2", "Amb Temp High L1", "Amb Temp High L2",
+    # Fault 3 (0x68) - Byte 0: MOS
+    "Chg MOS Temp Warn", "Dischg MOS Temp Warn", "Chg MOS Sensor Fail", "Dischg MOS Sensor Fail",
+    "Chg MOS Adhesion", "Dischg MOS Adhesion", "Chg MOS Open Circ", "Dischg MOS Open Circ",
+    # Fault 3 (0x68) - Byte 1: Hardware
+    "AFE Fail", "Volt Sensor Disconn", "Temp Sensor Fail", "EEPROM Fail",
+    "RTC Fail", "Precharge Fail", "Veh Comm Fail", "Int Net Fail",
+    # Fault 4 (0x69) - Byte 0: Other (bits 6-7 reserved)
+    "Curr Mod Fail", "Press Mod Fail", "Short Circ", "Low V Chg Prohibit",
+    "GPS/Switch MOS", "Chg Cab Offline", None, None,
+    # Fault 4 (0x69) - Byte 1: Reserved
+    None, None, None, None, None, None, None, None,
+)
+
 
 def get_fault_list(f1, f2, f3, f4):
     """Parse fault registers and return list of active fault strings."""
-    faults = []
-
-    # --- Fault Status 1 (0x66) ---
-    # Byte 0 (High Byte of register in Big Endian?) -> Actually Modbus register is 16-bit.
-    # Docs say "Byte 0" and "Byte 1". Usually in Modbus 16-bit int:
-    # High Byte = Bits 8-15, Low Byte = Bits 0-7.
-    # BUT checks usually "Bit 0" of "Byte 0".
-    # Let's assume the doc "Byte 0" corresponds to Low Byte (0-7) or High Byte?
-    # Standard Daly often: High Byte (First received) = Byte 0? Or Low Byte?
-    # Let's interpret simplisticly: 16-bit Value.
-    # Doc: "Byte 0: Bit 0...".
-    # If reg value is 0xAABB, Byte 0 usually means AA (High) or BB (Low)?
-    # In Modbus 0x66, value 0x1234 -> High Byte 0x12, Low Byte 0x34.
-    # If doc says "Byte 0... Bit 0", it might mean "First Byte, First Bit".
-    # Let's support both 16-bit mapping directly if "Level 1 alarm...".
-    # For now, I'll map assuming "Byte 0" is the LSB (Low Byte) and "Byte 1" is MSB (High Byte) OR vice versa.
-    # Let's simply break 16-bit val into LSB and MSB.
-    # val = (MSB << 8) | LSB.
-
-    # Fault 1
-    # Byte 0 (bits 0-7): Cell V High 1/2, Low 1/2...
-    # Byte 1 (bits 0-7): Charge Temp High, etc.
-
-    # Let's create dictionaries/lists for bits.
-    # We will assume: Reg Value = (Byte 1 << 8) | Byte 0   OR   (Byte 0 << 8) | Byte 1.
-    # Typically in Chinese BMS docs:
-    # "Byte 0" is often the first byte transmitted (MSB in Big Endian Modbus).
-    # "Bit 0" is the LSB of that byte.
-
-    f1_msb = (f1 >> 8) & 0xFF  # Byte 0?
-    f1_lsb = f1 & 0xFF         # Byte 1?
-
-    # MAPPING based on typical Daly order (Subject to verification)
-    # Usually: Alarm 1 (Warning), Alarm 2 (Protection).
-    # Let's list checks.
+    # Common case: no faults at all
+    if not (f1 | f2 | f3 | f4):
+        return []
 
-    # Fault 1 - Voltage (Byte 0?) & Temp (Byte 1?)
-    # Let's treat as bitmasks on the full 16-bit word if possible, or per byte.
-    # Doc Order:
-    # Byte 0:
-    # 0: Cell V High L1
-    # 1: Cell V High L2
-    # 2: Cell V Low L1
-    # 3: Cell V Low L2
-    # 4: Pack V High L1
-    # 5: Pack V High L2
-    # 6: Pack V Low L1
-    # 7: Pack V Low L2
+    # Big Endian pack puts each register's Byte 0 first; reading the bytes
+    # back little-endian gives the bit layout of FAULT_NAMES_BY_BITPOS.
+    w = int.from_bytes(struct.pack('>4H', f1, f2, f3, f4), 'little')
 
-    # If f1_msb matches this 'Byte 0', then:
-    if f1_msb & 0x01:
-        faults.append("Cell V High L1")
-    if f1_msb & 0x02:
-        faults.append("Cell V High L2")
-    if f1_msb & 0x04:
-        faults.append("Cell V Low L1")
-    if f1_msb & 0x08:
-        faults.append("Cell V Low L2")
-    if f1_msb & 0x10:
-        faults.append("Pack V High L1")
-    if f1_msb & 0x20:
-        faults.append("Pack V High L2")
-    if f1_msb & 0x40:
-        faults.append("Pack V Low L1")
-    if f1_msb & 0x80:
-        faults.append("Pack V Low L2")
-
-    # Byte 1 - Temps
-    if f1_lsb & 0x01:
-        faults.append("Chg Temp High L1")
-    if f1_lsb & 0x02:
-        faults.append("Chg Temp High L2")
-    if f1_lsb & 0x04:
-        faults.append("Chg Temp Low L1")
-    if f1_lsb & 0x08:
-        faults.append("Chg Temp Low L2")
-    if f1_lsb & 0x10:
-        faults.append("Dischg Temp High L1")
-    if f1_lsb & 0x20:
-        faults.append("Dischg Temp High L2")
-    if f1_lsb & 0x40:
-        faults.append("Dischg Temp Low L1")
-    if f1_lsb & 0x80:
-        faults.append("Dischg Temp Low L2")
-
-    # Fault 2 - Current / SOC / Diff
-    f2_msb = (f2 >> 8) & 0xFF
-    f2_lsb = f2 & 0xFF
-
-    if f2_msb & 0x01:
-        faults.append("Chg Overcur L1")
-    if f2_msb & 0x02:
-        faults.append("Chg Overcur L2")
-    if f2_msb & 0x04:
-        faults.append("Dischg Overcur L1")
-    if f2_msb & 0x08:
-        faults.append("Dischg Overcur L2")
-    if f2_msb & 0x10:
-        faults.append("SOC High L1")
-    if f2_msb & 0x20:
-        faults.append("SOC High L2")
-    if f2_msb & 0x40:
-        faults.append("SOC Low L1")
-    if f2_msb & 0x80:
-        faults.append("SOC Low L2")
-
-    if f2_lsb & 0x01:
-        faults.append("Diff V High L1")
-    if f2_lsb & 0x02:
-        faults.append("Diff V High L2")
-    if f2_lsb & 0x04:
-        faults.append("Diff Temp High L1")
-    if f2_lsb & 0x08:
-        faults.append("Diff Temp High L2")
-    if f2_lsb & 0x10:
-        faults.append("MOS Temp High L1")
-    if f2_lsb & 0x20:
-        faults.append("MOS Temp High L2")
-    if f2_lsb & 0x40:
-        faults.append("Amb Temp High L1")
-    if f2_lsb & 0x80:
-        faults.append("Amb Temp High L2")
-
-    # Fault 3 - MOS / Hardware
-    f3_msb = (f3 >> 8) & 0xFF
-    f3_lsb = f3 & 0xFF
-
-    if f3_msb & 0x01:
-        faults.append("Chg MOS Temp Warn")
-    if f3_msb & 0x02:
-        faults.append("Dischg MOS Temp Warn")
-    if f3_msb & 0x04:
-        faults.append("Chg MOS Sensor Fail")
-    if f3_msb & 0x08:
-        faults.append("Dischg MOS Sensor Fail")
-    if f3_msb & 0x10:
-        faults.append("Chg MOS Adhesion")
-    if f3_msb & 0x20:
-        faults.append("Dischg MOS Adhesion")
-    if f3_msb & 0x40:
-        faults.append("Chg MOS Open Circ")
-    if f3_msb & 0x80:
-        faults.append("Dischg MOS Open Circ")
-
-    if f3_lsb & 0x01:
-        faults.append("AFE Fail")
-    if f3_lsb & 0x02:
-        faults.append("Volt Sensor Disconn")
-    if f3_lsb & 0x04:
-        faults.append("Temp Sensor Fail")
-    if f3_lsb & 0x08:
-        faults.append("EEPROM Fail")
-    if f3_lsb & 0x10:
-        faults.append("RTC Fail")
-    if f3_lsb & 0x20:
-        faults.append("Precharge Fail")
-    if f3_lsb & 0x40:
-        faults.append("Veh Comm Fail")
-    if f3_lsb & 0x80:
-        faults.append("Int Net Fail")
-
-    # Fault 4 - Other
-    f4_msb = (f4 >> 8) & 0xFF
-
-    if f4_msb & 0x01:
-        faults.append("Curr Mod Fail")
-    if f4_msb & 0x02:
-        faults.append("Press Mod Fail")
-    if f4_msb & 0x04:
-        faults.append("Short Circ")
-    if f4_msb & 0x08:
-        faults.append("Low V Chg Prohibit")
-    if f4_msb & 0x10:
-        faults.append("GPS/Switch MOS")
-    if f4_msb & 0x20:
-        faults.append("Chg Cab Offline")
+    faults = []
+    names = FAULT_NAMES_BY_BITPOS
+    # Visit only the set bits, lowest first
+    while w:
+        lsb = w & -w
+        name = names[lsb.bit_length() - 1]
+        if name:
+            faults.append(name)
+        w ^= lsb
 
     return faults
@@ -2,11 +2,21 @@ import serial
 import struct
 import time
 
+try:
+    # Optional C-implemented CRC; falls back to the lookup table below
+    from crcmod.predefined import mkPredefinedCrcFun
+    _crc16 = mkPredefinedCrcFun('modbus')
+except ImportError:
+    _crc16 = None
+
 # ========== CONFIGURATION ==========
 PORT = 'COM9'        # Serial port for RS485 communication
 BAUDRATE = 9600      # Baud rate for Modbus RTU communication
 SHOW_DETAIL = False  # True = show detailed cell voltages, False = overview only
 LOOP_DELAY = 2       # Delay in seconds between each reading cycle
+# Modbus RTU silent interval between frames: 3.5 characters (11 bits each),
+# fixed at 1.75 ms above 19200 baud per the spec
+FRAME_GAP = max(3.5 * 11 / BAUDRATE, 0.00175)
 
 # Multiple Battery Configuration
 # Format: [(request_id, response_id, name), ...]
@@ -18,6 +28,19 @@ BATTERIES = [
     (0x83, 0x53, "Battery 3"),  # Third battery pack (add more as needed)
 ]
 
+def _crc16_entry(byte):
+    """Run the bitwise CRC16 (poly 0xA001) over a single byte value"""
+    crc = byte
+    for _ in range(8):
+        if crc & 0x0001:
+            crc = (crc >> 1) ^ 0xA001
+        else:
+            crc >>= 1
+    return crc
+
+# Lookup table for Modbus CRC16: one entry per possible byte value
+CRC_TABLE = tuple(_crc16_entry(b) for b in range(256))
+
 def calculate_crc(data):
     """Calculate Modbus RTU CRC16 checksum
     
@@ -27,14 +50,13 @@ def calculate_crc(data):
     Returns:
         2-byte CRC in little-endian format
     """
+    if _crc16 is not None:
+        return struct.pack('<H', _crc16(bytes(data)))
+
     crc = 0xFFFF
+    table = CRC_TABLE
     for byte in data:
-        crc ^= byte
-        for _ in range(8):
-            if crc & 0x0001:
-                crc = (crc >> 1) ^ 0xA001
-            else:
-                crc >>= 1
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
     return struct.pack('<H', crc)  # Pack as little-endian 16-bit
 
 def send_modbus_request(ser, slave_id, function_code, start_addr, count):
@@ -54,8 +76,9 @@ def send_modbus_request(ser, slave_id, function_code, start_addr, count):
     
     if SHOW_DETAIL:
         print(f"📤 TX: {request.hex().upper()}")
+    time.sleep(FRAME_GAP)  # Let the bus go idle after the previous frame
+    ser.reset_input_buffer()  # Drop late/stray bytes so the response starts aligned
     ser.write(request)
-    time.sleep(0.1)  # Small delay for transmission
 
 def read_modbus_response(ser, expected_slave_id=None, timeout=1.0):
     """Read Modbus RTU response from BMS
@@ -63,29 +86,25 @@ def read_modbus_response(ser, expected_slave_id=None, timeout=1.0):
     Args:
         ser: Serial port object
         expected_slave_id: Expected response slave ID (not enforced)
-        timeout: Response timeout in seconds
+        timeout: Response timeout in seconds, per read (header and body),
+            so a dead link can take up to 2x timeout
     
     Returns:
         List of register values, or None if error/timeout
     """
-    start_time = time.time()
-    response = b''
+    if ser.timeout != timeout:
+        ser.timeout = timeout
     
-    # Read response with timeout
-    while time.time() - start_time < timeout:
-        if ser.in_waiting > 0:
-            response += ser.read(ser.in_waiting)
-            time.sleep(0.05)  # Wait for complete frame
-        
-        # Check if we have received a complete frame
-        if len(response) >= 5:  # Minimum frame: slave + func + len + crc(2)
-            byte_count = response[2] if len(response) > 2 else 0
-            expected_len = 5 + byte_count  # slave + func + count + data + crc(2)
-            
-            if len(response) >= expected_len:
-                break
+    # Read the 3-byte header first (slave + func + byte count / error code),
+    # then exactly the remaining bytes; the driver blocks until they arrive
+    response = ser.read(3)
+    if len(response) == 3:
+        if response[1] == 0x03:
+            response += ser.read(response[2] + 2)  # data + crc(2)
+        elif response[1] >= 0x80:
+            response += ser.read(2)  # Error frame: only CRC(2) remains
     
-    if response:
+    if len(response) >= 3:
         if SHOW_DETAIL:
             print(f"📥 RX: {response.hex().upper()}")
         
@@ -103,13 +122,16 @@ def read_modbus_response(ser, expected_slave_id=None, timeout=1.0):
         # Parse normal response for function 03 (Read Holding Registers)
         if function_code == 0x03:
             byte_count = response[2]
+            
+            # Reject truncated frames and odd byte counts instead of parsing partial data
+            if len(response) != 5 + byte_count or byte_count % 2:
+                if SHOW_DETAIL:
+                    print(f"❌ Incomplete frame: expected {5 + byte_count} bytes, got {len(response)}")
+                return None
             data = response[3:3+byte_count]
             
             # Extract register values (16-bit each, big-endian format)
-            registers = []
-            for i in range(0, byte_count, 2):
-                reg_value = struct.unpack('>H', data[i:i+2])[0]
-                registers.append(reg_value)
+            registers = list(struct.unpack(f'>{byte_count // 2}H', data))
             
             return registers
     else:
@@ -160,8 +182,6 @@ try:
                     for i, value in enumerate(registers):
                         voltage_v = value / 1000.0
                         print(f"  Cell {i+1:2d}: {value:4d} mV ({voltage_v:.3f} V)")
-            
-            time.sleep(0.1)  # Short delay between battery reads
         
         # Display overview summary (always shown)
         print("\n📋 OVERVIEW:")
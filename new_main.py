@@ -2,13 +2,22 @@ import serial
 import struct
 import time
 import address
-from datetime import datetime
+
+try:
+    # Optional C-implemented CRC; falls back to the lookup table below
+    from crcmod.predefined import mkPredefinedCrcFun
+    _crc16 = mkPredefinedCrcFun('modbus')
+except ImportError:
+    _crc16 = None
 
 # ========== CONFIGURATION ==========
 PORT = 'COM9'        # Serial port for RS485 communication
 BAUDRATE = 115200      # Baud rate for Modbus RTU communication
 SHOW_DEBUG = False   # True = show raw TX/RX frames
 LOOP_DELAY = 1       # Delay in seconds between each reading cycle
+# Modbus RTU silent interval between frames: 3.5 characters (11 bits each),
+# fixed at 1.75 ms above 19200 baud per the spec
+FRAME_GAP = max(3.5 * 11 / BAUDRATE, 0.00175)
 
 # Multiple Battery Configuration
 # Format: [(request_id, response_id, name), ...]
@@ -20,55 +29,64 @@ BATTERIES = [
 ]
 
 
+def _crc16_entry(byte):
+    """Run the bitwise CRC16 (poly 0xA001) over a single byte value"""
+    crc = byte
+    for _ in range(8):
+        if crc & 0x0001:
+            crc = (crc >> 1) ^ 0xA001
+        else:
+            crc >>= 1
+    return crc
+
+
+# Lookup table for Modbus CRC16: one entry per possible byte value
+CRC_TABLE = tuple(_crc16_entry(b) for b in range(256))
+
+
 def calculate_crc(data):
     """Calculate Modbus RTU CRC16 checksum"""
+    if _crc16 is not None:
+        return struct.pack('<H', _crc16(bytes(data)))
+
     crc = 0xFFFF
+    table = CRC_TABLE
     for byte in data:
-        crc ^= byte
-        for _ in range(8):
-            if crc & 0x0001:
-                crc = (crc >> 1) ^ 0xA001
-            else:
-                crc >>= 1
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
     return struct.pack('<H', crc)
 
 
-def send_modbus_request(ser, slave_id, function_code, start_addr, count):
-    """Send Modbus RTU request to BMS"""
+def build_modbus_request(slave_id, function_code, start_addr, count):
+    """Build Modbus RTU request frame (with CRC)"""
     frame = struct.pack('>BBHH', slave_id, function_code, start_addr, count)
-    crc = calculate_crc(frame)
-    request = frame + crc
+    return frame + calculate_crc(frame)
+
 
+def send_modbus_frame(ser, request):
+    """Send a prebuilt Modbus RTU request frame to BMS"""
     if SHOW_DEBUG:
         print(f"📤 TX: {request.hex().upper()}")
+    time.sleep(FRAME_GAP)  # Let the bus go idle after the previous frame
+    ser.reset_input_buffer()  # Drop late/stray bytes so the response starts aligned
     ser.write(request)
-    time.sleep(0.05)
 
 
 def read_modbus_response(ser, timeout=1.0):
-    """Read Modbus RTU response from BMS"""
-    start_time = time.time()
-    response = b''
-
-    while time.time() - start_time < timeout:
-        if ser.in_waiting > 0:
-            response += ser.read(ser.in_waiting)
-            time.sleep(0.02)  # Wait for more bytes
-
-        # Minimum frame check
-        if len(response) >= 5:
-            # Modbus Function 03 response: ID(1) + Func(1) + Bytes(1) + Data(N) + CRC(2)
-            if response[1] == 0x03:
-                byte_count = response[2]
-                expected_len = 5 + byte_count
-                if len(response) >= expected_len:
-                    break
-            # Error response: ID(1) + Func(1) + Err(1) + CRC(2)
-            elif response[1] >= 0x80:
-                if len(response) >= 5:
-                    break
-
-    if response:
+    """Read Modbus RTU response from BMS (timeout applies per read, up to 2x per frame)"""
+    if ser.timeout != timeout:
+        ser.timeout = timeout
+
+    # Header: ID(1) + Func(1) + Bytes/Err(1); the driver blocks until it arrives
+    response = ser.read(3)
+    if len(response) == 3:
+        # Modbus Function 03 response: ID(1) + Func(1) + Bytes(1) + Data(N) + CRC(2)
+        if response[1] == 0x03:
+            response += ser.read(response[2] + 2)
+        # Error response: ID(1) + Func(1) + Err(1) + CRC(2)
+        elif response[1] >= 0x80:
+            response += ser.read(2)
+
+    if len(response) >= 3:
         if SHOW_DEBUG:
             print(f"📥 RX: {response.hex().upper()}")
 
@@ -81,17 +99,31 @@ def read_modbus_response(ser, timeout=1.0):
 
         if function_code == 0x03:
             byte_count = response[2]
+            # Incomplete frame or odd byte count
+            if len(response) != 5 + byte_count or byte_count % 2:
+                return None
             data = response[3:3+byte_count]
-            # Parse registers (Big Endian)
-            registers = []
-            for i in range(0, byte_count, 2):
-                reg_value = struct.unpack('>H', data[i:i+2])[0]
-                registers.append(reg_value)
-            return registers
+            # Parse registers (Big Endian) into a tuple; callers only index/slice it
+            return struct.unpack(f'>{byte_count // 2}H', data)
 
     return None
 
 
+# Output rows for the cycle table
+TABLE_RULE = "-" * 120
+HEADER_ROW = f"{'Battery':<12} | {'Volt(V)':<7} | {'Curr(A)':<7} | {'SOC(%)':<6} | {'Status':<10} | {'Min(mV)':<7} | {'Max(mV)':<7} | {'Diff':<5} | {'Cell Temp(C)':<20}"
+ROW_FMT = "{:<12} | {:7.1f} | {:7.1f} | {:6.1f} | {:<10} | {:<7} | {:<7} | {:<5} | {:<20}"
+TIMEOUT_ROW_FMT = "{:<12} | " + \
+    f"{'--':^7} | {'--':^7} | {'--':^6} | {'Timeout':<10} | {'--':^7} | {'--':^7} | {'--':^5} | {'--':^20}"
+
+# Request frames never change between cycles, so build them once per battery
+REQ_FRAMES = {
+    request_id: build_modbus_request(
+        request_id, 0x03, address.COMBINED_START_ADDRESS, address.COMBINED_REGISTER_COUNT)
+    for request_id, _, _ in BATTERIES
+}
+
+
 def main():
     try:
         print(f"🔌 Connecting to {PORT}...")
@@ -109,40 +141,26 @@ def main():
         cycle = 0
         while True:
             cycle += 1
-            print(
-                f"\n🔄 Cycle #{cycle} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            print("-" * 120)
-            print(f"{'Battery':<12} | {'Volt(V)':<7} | {'Curr(A)':<7} | {'SOC(%)':<6} | {'Status':<10} | {'Min(mV)':<7} | {'Max(mV)':<7} | {'Diff':<5} | {'Cell Temp(C)':<20}")
-            print("-" * 120)
+            print(f"\n🔄 Cycle #{cycle} - {time.strftime('%Y-%m-%d %H:%M:%S')}")
+            print(TABLE_RULE)
+            print(HEADER_ROW)
+            print(TABLE_RULE)
 
             for request_id, response_id, name in BATTERIES:
-                # ========== Read Battery Temperature (0x30-0x37) ==========
-                send_modbus_request(
-                    ser, request_id, 0x03, address.BATT_TEMP_START_ADDRESS, address.BATT_TEMP_REGISTER_COUNT)
-                temp_registers = read_modbus_response(ser)
-
-                cell_temps = []
-                if temp_registers and len(temp_registers) >= 4:
-                    # Parse individual cell temperatures
-                    cell_temp_1 = temp_registers[address.BATT_TEMP_OFFSET_CELL_1] - \
-                        address.TEMP_OFFSET
-                    cell_temp_2 = temp_registers[address.BATT_TEMP_OFFSET_CELL_2] - \
-                        address.TEMP_OFFSET
-                    cell_temp_3 = temp_registers[address.BATT_TEMP_OFFSET_CELL_3] - \
-                        address.TEMP_OFFSET
-                    cell_temp_4 = temp_registers[address.BATT_TEMP_OFFSET_CELL_4] - \
-                        address.TEMP_OFFSET
-                    cell_temps = [cell_temp_1, cell_temp_2, cell_temp_3, cell_temp_4]
-
-                time.sleep(0.05)  # Small delay between requests
-
-                # ========== Read Battery Pack Data (0x38-0x69) ==========
-                # Note: Reading 50 registers (0x38 to 0x69)
-                send_modbus_request(
-                    ser, request_id, 0x03, address.START_ADDRESS, address.REGISTER_COUNT)
-                registers = read_modbus_response(ser)
-
-                if registers and len(registers) == address.REGISTER_COUNT:
+                # ========== Read Temperature + Pack Data (0x30-0x69) ==========
+                # Note: Reading 58 registers in one request, then splitting into
+                # temperature (0x30-0x37) and pack data (0x38-0x69)
+                send_modbus_frame(ser, REQ_FRAMES[request_id])
+                combined = read_modbus_response(ser)
+
+                if combined and len(combined) == address.COMBINED_REGISTER_COUNT:
+                    temp_registers = combined[:address.COMBINED_PACK_OFFSET]
+                    registers = combined[address.COMBINED_PACK_OFFSET:]
+
+                    # Parse individual cell temperatures (Cell 1-4 are contiguous)
+                    cell_temps = [t - address.TEMP_OFFSET for t in temp_registers[
+                        address.BATT_TEMP_OFFSET_CELL_1:address.BATT_TEMP_OFFSET_CELL_4 + 1]]
+
                     # Parse Data
                     voltage = registers[address.OFFSET_VOLTAGE] / 10.0
 
@@ -168,24 +186,19 @@ def main():
                     rem_cap = registers[address.OFFSET_REMAINING_CAP] / 10.0
 
                     # Format cell temperatures
-                    cell_temp_str = "/".join([f"{t}" for t in cell_temps]) if cell_temps else "--"
+                    cell_temp_str = "/".join([f"{t}" for t in cell_temps])
 
-                    print(f"{name:<12} | {voltage:7.1f} | {current:7.1f} | {soc:6.1f} | {status_str:<10} | {min_v:<7} | {max_v:<7} | {diff_v:<5} | {cell_temp_str:<20}")
+                    print(ROW_FMT.format(
+                        name, voltage, current, soc, status_str, min_v, max_v, diff_v, cell_temp_str))
 
                     # Check for Faults
-                    f1 = registers[address.OFFSET_FAULT_1]
-                    f2 = registers[address.OFFSET_FAULT_2]
-                    f3 = registers[address.OFFSET_FAULT_3]
-                    f4 = registers[address.OFFSET_FAULT_4]
+                    f1, f2, f3, f4 = registers[address.OFFSET_FAULT_1:address.OFFSET_FAULT_4 + 1]
 
                     fault_list = address.get_fault_list(f1, f2, f3, f4)
                     if fault_list:
                         print(f"  ⚠️ FAULTS: {', '.join(fault_list)}")
                 else:
-                    print(
-                        f"{name:<12} | {'--':^7} | {'--':^7} | {'--':^6} | {'Timeout':<10} | {'--':^7} | {'--':^7} | {'--':^5} | {'--':^20}")
-
-                time.sleep(0.1)
+                    print(TIMEOUT_ROW_FMT.format(name))
 
             time.sleep(LOOP_DELAY)
 